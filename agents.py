@@ -1,46 +1,32 @@
-import boto3
-import json
+import orjson
+import numpy as np
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
-import os
+from aws_clients import setup_env_once, get_client
 
-# Load environment variables
-load_dotenv()
+# Canned explanations per decision, formatted only for the decision that was picked
+_FALLBACK_TEMPLATES = {
+    "BUY NOW": "Great deal! At ${cheapest}, this is significantly below the typical range of ${q10}-${q90}. Book soon as prices this low don't last long.",
+    "BUY": "Good price at ${cheapest}. This is below the median price and within a reasonable range. Consider booking if it fits your budget.",
+    "WAIT": "Current price of ${cheapest} is above average. Historical data suggests waiting a few days or being flexible with dates could save you money.",
+    "ALTERNATE": "Price of ${cheapest} is quite high compared to typical range of ${q10}-${q90}. Consider different dates, nearby airports, or alternative routes."
+}
 
 class BedrockAgent:
     def __init__(self):
-        try:
-            # Setup AWS credentials from .env
-            os.environ['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
-            os.environ['AWS_SECRET_ACCESS_KEY'] = os.getenv('AWS_SECRET_ACCESS_KEY')
-            os.environ['AWS_SESSION_TOKEN'] = os.getenv('AWS_SESSION_TOKEN')
-            
-            self.bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-            self.model_id = "anthropic.claude-3-5-sonnet-20241022-v2:0"
-            self.available = True
-            print("Bedrock agent initialized successfully")
-        except Exception as e:
-            print(f"Bedrock not available: {e}")
-            self.available = False
-    
-    def generate_explanation(self, flight_data, price_stats, recommendation, user_context):
-        """Generate natural language explanation using Bedrock"""
-        if not self.available:
-            return self._fallback_explanation(flight_data, price_stats, recommendation)
-        
-        prompt = f"""
+        # Prompt skeleton and request envelope are fixed; only the fields change per call
+        self._prompt_tmpl = """
         You are a travel pricing expert. Analyze this flight data and provide a clear, actionable explanation.
 
         Flight Search Context:
-        - Route: {user_context.get('origin', 'N/A')} → {user_context.get('destination', 'N/A')}
-        - Budget: ${user_context.get('budget', 'N/A')}
-        - Departure: {user_context.get('date', 'N/A')}
+        - Route: {origin} → {destination}
+        - Budget: ${budget}
+        - Departure: {date}
 
         Current Analysis:
-        - Cheapest flight: ${flight_data['flights'][0]['price'] if flight_data['flights'] else 'N/A'}
-        - Price range (10th-90th percentile): ${price_stats['q10']}-${price_stats['q90']}
-        - Recommendation: {recommendation['decision']}
-        - Confidence: {recommendation['confidence']:.0%}
+        - Cheapest flight: ${cheapest}
+        - Price range (10th-90th percentile): ${q10}-${q90}
+        - Recommendation: {decision}
+        - Confidence: {confidence:.0%}
 
         Provide a 2-3 sentence explanation that:
         1. Explains the current price position
@@ -50,52 +36,107 @@ class BedrockAgent:
         Keep it conversational and helpful.
         """
         
+        self._body_prefix = b'{"anthropic_version": "bedrock-2023-05-31", "max_tokens": 200, "messages": [{"role": "user", "content": '
+        self._body_suffix = b'}]}'
+        
         try:
-            response = self.bedrock.invoke_model(
+            # Setup AWS credentials from .env
+            setup_env_once()
+            
+            self.bedrock = get_client('bedrock-runtime')
+            self.model_id = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+            self.available = True
+            print("Bedrock agent initialized successfully")
+        except Exception as e:
+            print(f"Bedrock not available: {e}")
+            self.available = False
+    
+    def generate_explanation(self, flight_data, price_stats, recommendation, user_context):
+        """Stream a natural language explanation from Bedrock, yielding text as it arrives"""
+        if not self.available:
+            yield self._fallback_explanation(flight_data, price_stats, recommendation)
+            return
+        
+        prompt = self._prompt_tmpl.format_map({
+            'origin': user_context.get('origin', 'N/A'),
+            'destination': user_context.get('destination', 'N/A'),
+            'budget': user_context.get('budget', 'N/A'),
+            'date': user_context.get('date', 'N/A'),
+            'cheapest': flight_data['flights'][0].price if flight_data['flights'] else 'N/A',
+            'q10': price_stats['q10'],
+            'q90': price_stats['q90'],
+            'decision': recommendation['decision'],
+            'confidence': recommendation['confidence']
+        })
+        body = self._body_prefix + orjson.dumps(prompt) + self._body_suffix
+        
+        streamed = False
+        try:
+            response = self.bedrock.invoke_model_with_response_stream(
                 modelId=self.model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 200,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
+                body=body
             )
             
-            result = json.loads(response['body'].read())
-            return result['content'][0]['text'].strip()
+            for event in response['body']:
+                if 'chunk' not in event:
+                    continue
+                chunk = orjson.loads(event['chunk']['bytes'])
+                if chunk['type'] == 'content_block_delta':
+                    streamed = True
+                    yield chunk['delta']['text']
             
         except ClientError as e:
-            return self._fallback_explanation(flight_data, price_stats, recommendation)
+            # Only fall back if nothing reached the caller yet
+            if not streamed:
+                yield self._fallback_explanation(flight_data, price_stats, recommendation)
+    
+    def generate_explanation_full(self, flight_data, price_stats, recommendation, user_context):
+        """Generate the complete explanation as a single string"""
+        return "".join(self.generate_explanation(flight_data, price_stats, recommendation, user_context)).strip()
     
     def _fallback_explanation(self, flight_data, price_stats, recommendation):
         """Fallback explanation when Bedrock is unavailable"""
         if not flight_data['flights']:
             return "No flights found for this route. Try different dates or nearby airports."
         
-        cheapest = flight_data['flights'][0]['price']
+        cheapest = flight_data['flights'][0].price
         decision = recommendation['decision']
         
-        explanations = {
-            "BUY NOW": f"Great deal! At ${cheapest}, this is significantly below the typical range of ${price_stats['q10']}-${price_stats['q90']}. Book soon as prices this low don't last long.",
-            "BUY": f"Good price at ${cheapest}. This is below the median price and within a reasonable range. Consider booking if it fits your budget.",
-            "WAIT": f"Current price of ${cheapest} is above average. Historical data suggests waiting a few days or being flexible with dates could save you money.",
-            "ALTERNATE": f"Price of ${cheapest} is quite high compared to typical range of ${price_stats['q10']}-${price_stats['q90']}. Consider different dates, nearby airports, or alternative routes."
-        }
-        
-        return explanations.get(decision, "Unable to generate recommendation at this time.")
+        tmpl = _FALLBACK_TEMPLATES.get(decision)
+        if tmpl is None:
+            return "Unable to generate recommendation at this time."
+        return tmpl.format(cheapest=cheapest, q10=price_stats['q10'], q90=price_stats['q90'])
 
     def analyze_market_trends(self, price_history):
         """Analyze price trends and patterns"""
-        if not self.available or not price_history:
+        if not self.available or price_history is None or len(price_history) == 0:
             return "Price trend analysis unavailable."
         
+        prices = np.asarray(price_history, dtype=np.float64)
         recent_trend = "stable"
-        if len(price_history) >= 5:
-            recent_avg = sum(price_history[-5:]) / 5
-            older_avg = sum(price_history[-10:-5]) / 5 if len(price_history) >= 10 else recent_avg
+        if prices.size >= 5:
+            recent_avg = prices[-5:].mean()
+            older_avg = prices[-10:-5].mean() if prices.size >= 10 else recent_avg
             
             if recent_avg > older_avg * 1.1:
                 recent_trend = "increasing"
             elif recent_avg < older_avg * 0.9:
                 recent_trend = "decreasing"
         
-        return f"Recent price trend: {recent_trend}"
\ No newline at end of file
+        return f"Recent price trend: {recent_trend}"
+
+    def analyze_market_trends_batch(self, histories):
+        """Label each route's recent trend from an (R, T) price array: increasing, decreasing, stable or unavailable"""
+        histories = np.asarray(histories, dtype=np.float64)
+        if histories.ndim != 2:
+            raise ValueError(f"expected an (R, T) array of price histories, got shape {histories.shape}")
+        if not self.available or histories.shape[1] == 0:
+            return np.full(histories.shape[0], "unavailable")
+        if histories.shape[1] < 5:
+            return np.full(histories.shape[0], "stable")
+        
+        recent = histories[:, -5:].mean(axis=1)
+        older = histories[:, -10:-5].mean(axis=1) if histories.shape[1] >= 10 else recent
+        
+        return np.where(recent > older * 1.1, "increasing",
+                        np.where(recent < older * 0.9, "decreasing", "stable"))
\ No newline at end of file
@@ -226,7 +226,7 @@ if search_button and origin and destination:
             st.info("Try popular routes like JFK-LAX or LAX-JFK")
         else:
             # Analysis
-            cheapest_price = flight_data['flights'][0]['price']
+            cheapest_price = flight_data['flights'][0].price
             price_stats = predict_price_range(price_history, cheapest_price)
             recommendation = decide_recommendation(cheapest_price, price_stats, budget)
             
@@ -244,7 +244,7 @@ if search_button and origin and destination:
                 'booking_insights': booking_insights
             }
             
-            explanation = agent.generate_explanation(
+            explanation_stream = agent.generate_explanation(
                 flight_data, price_stats, recommendation, user_context
             )
             
@@ -256,13 +256,23 @@ if search_button and origin and destination:
                 "ALTERNATE": "🔴"
             }
             
-            st.markdown(f"""
-            <div class="card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; text-align: center;">
-                <h3 style="margin: 0 0 15px 0;">{decision_color.get(recommendation['decision'], '⚪')} {recommendation['decision']}</h3>
-                <p style="font-size: 16px; margin: 10px 0; opacity: 0.9;">{explanation}</p>
-                <p style="margin: 0;"><strong>Confidence:</strong> {recommendation['confidence']:.0%}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Draw the card up front, then re-render it as explanation text streams in
+            recommendation_card = st.empty()
+            
+            def render_recommendation(explanation):
+                recommendation_card.markdown(f"""
+                <div class="card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; text-align: center;">
+                    <h3 style="margin: 0 0 15px 0;">{decision_color.get(recommendation['decision'], '⚪')} {recommendation['decision']}</h3>
+                    <p style="font-size: 16px; margin: 10px 0; opacity: 0.9;">{explanation.strip()}</p>
+                    <p style="margin: 0;"><strong>Confidence:</strong> {recommendation['confidence']:.0%}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            explanation = ""
+            render_recommendation(explanation)
+            for chunk in explanation_stream:
+                explanation += chunk
+                render_recommendation(explanation)
             
             # Results layout
             col1, col2 = st.columns([2, 1])
@@ -273,18 +283,18 @@ if search_button and origin and destination:
                 
                 for idx, flight in enumerate(flight_data['flights'][:5]):
                     book_link = google_flights_url(origin, destination, departure_date, return_date)
-                    flight_date = flight.get('search_date', departure_date.strftime('%Y-%m-%d'))
+                    flight_date = flight.search_date or departure_date.strftime('%Y-%m-%d')
                     st.markdown(f"""
                     <div class="flight-card">
                         <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap;">
                             <div style="flex: 2; min-width: 200px;">
-                                <h4 style="margin: 0; color: #333;">{flight.get('airline','')}</h4>
-                                <p style="margin: 5px 0; color: #666;">{flight.get('departure_time','')} → {flight.get('arrival_time','')}</p>
-                                <small style="color: #888;">Date: {flight_date} | Duration: {flight.get('duration','')}</small>
+                                <h4 style="margin: 0; color: #333;">{flight.airline}</h4>
+                                <p style="margin: 5px 0; color: #666;">{flight.departure_time} → {flight.arrival_time}</p>
+                                <small style="color: #888;">Date: {flight_date} | Duration: {flight.duration}</small>
                             </div>
                             <div style="flex: 1; text-align: center; min-width: 120px;">
-                                <h3 style="margin: 0; color: {'green' if flight['price'] <= budget else 'red'};">S${int(flight['price'])}</h3>
-                                <span style="font-size: 12px; color: #666;">{'Great Deal!' if flight['price'] <= price_stats['q10'] else 'Good Price' if flight['price'] <= price_stats['q50'] else 'High Price'}</span>
+                                <h3 style="margin: 0; color: {'green' if flight.price <= budget else 'red'};">S${int(flight.price)}</h3>
+                                <span style="font-size: 12px; color: #666;">{'Great Deal!' if flight.price <= price_stats['q10'] else 'Good Price' if flight.price <= price_stats['q50'] else 'High Price'}</span>
                             </div>
                             <div style="flex: 0 0 auto; min-width: 80px;">
                                 <a href="{book_link}" target="_blank" 
@@ -299,17 +309,17 @@ if search_button and origin and destination:
                     st.subheader(f"Return Flights: {destination} → {origin}")
                     for r_idx, r in enumerate(flight_data['return_flights'][:5]):
                         book_link = google_flights_url(origin, destination, departure_date, return_date)
-                        return_flight_date = r.get('search_date', return_date.strftime('%Y-%m-%d') if return_date else '')
+                        return_flight_date = r.search_date or (return_date.strftime('%Y-%m-%d') if return_date else '')
                         st.markdown(f"""
                         <div class="flight-card">
                             <div style="display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;">
                                 <div style="flex:2;min-width:200px;">
-                                    <h4 style="margin:0;color:#333;">{r.get('airline','')}</h4>
-                                    <p style="margin:5px 0;color:#666;">{r.get('departure_time','')} → {r.get('arrival_time','')}</p>
-                                    <small style="color:#888;">Date: {return_flight_date} | Duration: {r.get('duration','')}</small>
+                                    <h4 style="margin:0;color:#333;">{r.airline}</h4>
+                                    <p style="margin:5px 0;color:#666;">{r.departure_time} → {r.arrival_time}</p>
+                                    <small style="color:#888;">Date: {return_flight_date} | Duration: {r.duration}</small>
                                 </div>
                                 <div style="flex:1;text-align:center;min-width:120px;">
-                                    <h3 style="margin:0;color:{'green' if r['price'] <= budget else 'red'};">S${int(r['price'])}</h3>
+                                    <h3 style="margin:0;color:{'green' if r.price <= budget else 'red'};">S${int(r.price)}</h3>
                                 </div>
                                 <div style="flex:0 0 auto;min-width:80px;">
                                     <a href="{book_link}" target="_blank"
@@ -372,7 +382,7 @@ if search_button and origin and destination:
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Price history chart
-                if price_history:
+                if len(price_history):
                     trend_df = pd.DataFrame({
                         'Day': range(len(price_history)),
                         'Price': price_history
@@ -0,0 +1,36 @@
+import os
+import functools
+from dotenv import load_dotenv
+
+_env_ready = False
+
+def setup_env_once():
+    """Load .env and export AWS credentials into the environment, once per process"""
+    global _env_ready
+    if _env_ready:
+        return
+
+    load_dotenv()
+    os.environ['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
+    os.environ['AWS_SECRET_ACCESS_KEY'] = os.getenv('AWS_SECRET_ACCESS_KEY')
+    os.environ['AWS_SESSION_TOKEN'] = os.getenv('AWS_SESSION_TOKEN')
+    os.environ['AWS_DEFAULT_REGION'] = os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
+    _env_ready = True
+
+# Shared AWS session; clients and resources built from it are memoized so
+# each service model is only parsed once per process. boto3 is imported on
+# first use to keep it off the import path.
+@functools.lru_cache(maxsize=1)
+def _session():
+    import boto3
+    return boto3.Session(region_name='us-east-1')
+
+@functools.lru_cache(maxsize=None)
+def get_client(name):
+    """Get the shared boto3 client for a service"""
+    return _session().client(name)
+
+@functools.lru_cache(maxsize=None)
+def get_resource(name):
+    """Get the shared boto3 resource for a service"""
+    return _session().resource(name)
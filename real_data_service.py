@@ -1,38 +1,230 @@
 import os
-import boto3
-import requests
-import json
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-import pandas as pd
+import math
+import time
+import asyncio
+import threading
+import weakref
+import aiohttp
+import re
+import orjson
+import zstandard
+from datetime import datetime
+from operator import attrgetter
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-from amadeus import Client, ResponseError
+from numba import njit
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from aws_clients import setup_env_once, get_client, get_resource
 
-# Load environment variables
-load_dotenv()
+AMADEUS_BASE_URL = 'https://test.api.amadeus.com'
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?')
+_BY_PRICE = attrgetter('price')
+
+# Airline-specific pricing
+AIRLINE_FACTORS: Mapping[str, float] = MappingProxyType({
+    'Singapore Airlines': 1.3, 'Emirates': 1.25, 'Qatar Airways': 1.2, 'Cathay Pacific': 1.15,
+    'British Airways': 1.1, 'Air France': 1.1, 'Lufthansa': 1.1, 'KLM': 1.1, 'Swiss': 1.15,
+    'ANA': 1.2, 'JAL': 1.2, 'Korean Air': 1.1, 'Asiana Airlines': 1.05, 'EVA Air': 1.1,
+    'Thai Airways': 1.0, 'Malaysia Airlines': 0.95, 'Garuda Indonesia': 0.9, 'Philippine Airlines': 0.9,
+    'Delta': 1.1, 'American': 1.05, 'United': 1.0, 'JetBlue': 0.9, 'Southwest': 0.85, 'Alaska': 0.9,
+    'Qantas': 1.15, 'Virgin Australia': 1.0, 'Air Canada': 1.05, 'WestJet': 0.9,
+    'LATAM': 1.0, 'Avianca': 0.95, 'GOL': 0.85, 'Azul': 0.9,
+    'Air India': 0.8, 'IndiGo': 0.7, 'Vistara': 0.85, 'SpiceJet': 0.65,
+    'AirAsia': 0.6, 'Scoot': 0.65, 'Jetstar': 0.7, 'Cebu Pacific': 0.6, 'Lion Air': 0.55,
+    'Ryanair': 0.5, 'EasyJet': 0.6, 'Wizz Air': 0.55, 'Vueling': 0.65,
+    'flydubai': 0.75, 'Air Arabia': 0.65, 'Pegasus': 0.6
+})
+
+# Array form of AIRLINE_FACTORS for vectorized lookups; the trailing entry is
+# the 1.0 default used for airlines missing from the table
+AIRLINE_ORDER = tuple(AIRLINE_FACTORS)
+AIRLINE_IDX = {name: i for i, name in enumerate(AIRLINE_ORDER)}
+AIRLINE_FACTORS_ARR = np.array([AIRLINE_FACTORS[name] for name in AIRLINE_ORDER] + [1.0], dtype=np.float32)
+
+def _airline_idx(airlines):
+    """Map airline names to their AIRLINE_FACTORS_ARR indices"""
+    return np.fromiter((AIRLINE_IDX.get(a, len(AIRLINE_ORDER)) for a in airlines),
+                       dtype=np.int32, count=len(airlines))
+
+# Simulated route pricing, shared by generated flights and price history;
+# each route's airlines are resolved to factor indices once at load
+DEFAULT_AIRLINES = ('Singapore Airlines', 'Emirates', 'Qatar Airways')
+DEFAULT_AIRLINE_IDX = _airline_idx(DEFAULT_AIRLINES)
+ROUTES: Mapping[str, Mapping] = MappingProxyType({
+    route: MappingProxyType({'base_price': base_price, 'airlines': airlines, 'airline_idx': _airline_idx(airlines)})
+    for route, base_price, airlines in (
+        ('JFK-LAX', 280, ('Delta', 'JetBlue', 'American', 'United')),
+        ('LAX-JFK', 290, ('Delta', 'JetBlue', 'American', 'United')),
+        ('JFK-MIA', 220, DEFAULT_AIRLINES),
+        ('LAX-SFO', 150, DEFAULT_AIRLINES),
+        ('SIN-BKK', 180, ('Singapore Airlines', 'Thai Airways', 'Scoot', 'AirAsia')),
+        ('BKK-SIN', 175, ('Singapore Airlines', 'Thai Airways', 'Scoot', 'AirAsia')),
+        ('SIN-JFK', 1200, ('Singapore Airlines', 'United', 'Emirates')),
+        ('JFK-SIN', 1150, ('Singapore Airlines', 'United', 'Emirates')),
+    )
+})
+
+def _route_info(route, default_price):
+    """Look up (base_price, airlines, airline_idx) for a route, falling back to the default airlines"""
+    info = ROUTES.get(route)
+    if info is None:
+        return default_price, DEFAULT_AIRLINES, DEFAULT_AIRLINE_IDX
+    return info['base_price'], info['airlines'], info['airline_idx']
+
+# Aircraft flown on simulated routes; anything not listed flies a B737
+AIRCRAFT: Mapping[str, str] = MappingProxyType({'JetBlue': 'A320', 'Spirit': 'A320'})
+
+# Simulated departure slots (4 flights per airline) as (hour, minute, price
+# factor), their arrivals after a 5h 20m flight, wrapping past midnight, and
+# the time-based pricing of each slot
+_SLOTS = ((6, 0, 0.9), (8, 30, 1.1), (11, 0, 1.0), (14, 30, 1.0))
+_FLIGHT_MINUTES = 5 * 60 + 20
+TIMES = tuple(f"{h:02d}:{m:02d}" for h, m, _ in _SLOTS)
+ARRIVAL_TIMES = tuple(
+    "{:02d}:{:02d}".format(*divmod((h * 60 + m + _FLIGHT_MINUTES) % 1440, 60)) for h, m, _ in _SLOTS
+)
+TIME_FACTORS = np.array([factor for _, _, factor in _SLOTS])
+
+@dataclass(slots=True)
+class Flight:
+    """A single flight offer"""
+    airline: str
+    price: int
+    departure_time: str
+    arrival_time: str
+    duration: str
+    stops: int = 0
+    booking_class: str = 'Economy'
+    aircraft: str = ''
+    search_date: str = ''
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+def _item_prices(item):
+    """Decode a history item's prices from the compressed blob, or the legacy Number list"""
+    if 'prices_blob' in item:
+        return np.frombuffer(zstandard.decompress(item['prices_blob'].value), dtype=np.int32)
+    return np.asarray(item.get('prices', []), dtype=np.float32)
+
+def _history_query(route):
+    """Query kwargs for a route's newest history items, projecting only the price attributes"""
+    return {
+        'KeyConditionExpression': 'route = :route',
+        'ExpressionAttributeValues': {':route': route},
+        'ProjectionExpression': 'prices_blob, prices',
+        'ScanIndexForward': False
+    }
+
+def _decode_history(items):
+    """Concatenate the prices of queried history items into one int32 array"""
+    if not items:
+        return np.empty(0, dtype=np.int32)
+    return np.concatenate([_item_prices(item) for item in items]).astype(np.int32)
+
+@njit(cache=True)
+def _gen_prices(base, demand, seasonal, airline_f, time_f, noise):
+    """Price every (airline, time) pair in one compiled pass; serial, so it is safe to call from any thread"""
+    out = np.empty((airline_f.size, time_f.size), np.int32)
+    for i in range(airline_f.size):
+        for j in range(time_f.size):
+            out[i, j] = int(base * demand * seasonal * airline_f[i] * time_f[j] * noise[i, j])
+    return out
+
+def _shutdown_loop(loop, thread, session):
+    """Close the HTTP session, then stop, join and close its event loop thread"""
+    if loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+    loop.close()
+
+@njit(cache=True)
+def _gen_hist(base_price, n=30):
+    """Generate n days of trending, noisy prices with a weekend premium and a 60% floor"""
+    prices = np.empty(n, dtype=np.int32)
+    floor = int(base_price * 0.6)
+    for i in range(n):
+        trend = math.sin(i * 0.2) * 20  # Weekly cycles
+        noise = np.random.normal(0.0, 15.0)  # Random variation
+        seasonal = 10 if i % 7 >= 4 else -5  # Weekend premium
+        prices[i] = max(int(base_price + trend + noise + seasonal), floor)  # Floor price
+    return prices
 
 class RealFlightDataService:
-    def __init__(self):
+    def __init__(self, live_cache_ttl=600, history_cache_ttl=3600):
         self.setup_aws()
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.dynamodb = get_resource('dynamodb')
+        self.s3 = get_client('s3')
         
-        self.amadeus = Client(
-            client_id=os.getenv("AMADEUS_CLIENT_ID"),
-            client_secret=os.getenv("AMADEUS_CLIENT_SECRET")
-        )
+        # Background event loop owning a long-lived keep-alive HTTP session, so
+        # sync callers reuse pooled Amadeus connections across calls. The
+        # session is bound to this loop, so coroutines awaited from other
+        # loops hand their work over to it (see _on_loop).
+        self._loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(self._create_session(), self._loop).result()
+        # Shut the loop down on close(), collection or interpreter exit; the
+        # finalizer holds no reference to self, so instances stay collectable
+        self._finalizer = weakref.finalize(self, _shutdown_loop, self._loop, thread, self._session)
+        self._aio_session = None
+        self._token = None
+        self._token_exp = 0
         
         # Comprehensive airline code mapping
         self.airline_names = self._load_airline_codes()
+        self._airline_names_upper = {code.upper(): name for code, name in self.airline_names.items()}
+        
+        # Shared generator for simulated pricing
+        self._rng = np.random.default_rng()
+        
+        # Short-lived caches in front of Amadeus and DynamoDB; the TTLs bound
+        # how stale a cached price can be. Only results from the real source
+        # are cached, so a failed call never pins generated prices.
+        self._live_cache = TTLCache(maxsize=512, ttl=live_cache_ttl)
+        self._hist_cache = TTLCache(maxsize=512, ttl=history_cache_ttl)
+        self._cache_lock = threading.Lock()
+
+    def _run(self, coro):
+        """Run a coroutine on the service's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._live_loop(coro)).result()
+
+    def _live_loop(self, coro):
+        """Return the service's event loop, refusing (and discarding) work once it has shut down"""
+        if not self._loop.is_running():
+            coro.close()
+            raise RuntimeError("RealFlightDataService is closed")
+        return self._loop
+
+    async def _on_loop(self, coro):
+        """Await a coroutine on the service's event loop, handing it over when called from another loop"""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._live_loop(coro)))
+
+    def _aio_dynamodb(self):
+        """Open an aioboto3 DynamoDB resource, creating the async session on first use"""
+        if self._aio_session is None:
+            import aioboto3
+            self._aio_session = aioboto3.Session(region_name='us-east-1')
+        return self._aio_session.resource('dynamodb')
+
+    async def _create_session(self):
+        """Create the pooled keep-alive HTTP session on the service's event loop"""
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60))
+
+    def close(self):
+        """Close the shared HTTP session and shut down the background event loop; safe to call twice"""
+        self._finalizer()
 
     def setup_aws(self):
         """Setup AWS credentials from .env file"""
-        os.environ['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
-        os.environ['AWS_SECRET_ACCESS_KEY'] = os.getenv('AWS_SECRET_ACCESS_KEY') 
-        os.environ['AWS_SESSION_TOKEN'] = os.getenv('AWS_SESSION_TOKEN')
-        os.environ['AWS_DEFAULT_REGION'] = os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
+        setup_env_once()
     
     def _load_airline_codes(self):
         """Load comprehensive airline code to name mapping"""
@@ -62,21 +254,76 @@ class RealFlightDataService:
         if not airline_code:
             return "Unknown Airline"
         
-        if airline_code in self.airline_names:
-            return self.airline_names[airline_code]
-        
-        for code, name in self.airline_names.items():
-            if code.upper() == airline_code.upper():
-                return name
-        
-        return f"{airline_code} Airlines"
+        return self._airline_names_upper.get(airline_code.upper(), f"{airline_code} Airlines")
 
     def fetch_live_flights(self, origin, destination, date):
         """Fetch real-time flight data using multiple sources"""
+        return self._run(self._fetch_live_flights_async(origin, destination, date))
+
+    def _parse_amadeus_offers(self, offers):
+        """Convert Amadeus flight offers into Flight records"""
+        flights = []
+        for offer in offers:
+            itinerary = offer['itineraries'][0]
+            segments = itinerary['segments']
+            
+            # ISO datetimes are fixed width, so HH:MM is always at [11:16]
+            dep_time = segments[0]['departure']['at'][11:16]
+            arr_time = segments[-1]['arrival']['at'][11:16]
+            
+            # Convert duration from ISO format, e.g. PT5H20M -> 5h 20m
+            m = _DURATION_RE.match(itinerary['duration'])
+            duration = f"{m.group(1) or 0}h {m.group(2) or 0}m" if m else itinerary['duration']
+            
+            flights.append(Flight(
+                airline=self.get_airline_name(segments[0]['carrierCode']),
+                price=int(float(offer['price']['total'])),
+                departure_time=dep_time,
+                arrival_time=arr_time,
+                duration=duration,
+                stops=len(segments) - 1
+            ))
+        
+        return flights
+
+    async def _amadeus_token(self):
+        """Get an Amadeus OAuth2 bearer token, cached until shortly before it expires"""
+        if self._token and time.time() < self._token_exp:
+            return self._token
+        
+        async with self._session.post(
+            f"{AMADEUS_BASE_URL}/v1/security/oauth2/token",
+            data={
+                'grant_type': 'client_credentials',
+                'client_id': os.getenv("AMADEUS_CLIENT_ID"),
+                'client_secret': os.getenv("AMADEUS_CLIENT_SECRET")
+            }
+        ) as resp:
+            resp.raise_for_status()
+            payload = orjson.loads(await resp.read())
+        
+        self._token = payload['access_token']
+        self._token_exp = time.time() + payload.get('expires_in', 1799) - 60
+        return self._token
+
+    async def fetch_live_flights_async(self, origin, destination, date):
+        """Async variant of fetch_live_flights sharing its TTL cache; safe to await from any event loop"""
+        return await self._on_loop(self._fetch_live_flights_async(origin, destination, date))
+
+    async def _fetch_live_flights_async(self, origin, destination, date):
+        """Serve cached Amadeus offers, fetching over the shared aiohttp session and falling back to generated data"""
+        key = hashkey(origin, destination, str(date))
+        with self._cache_lock:
+            flights = self._live_cache.get(key)
+        if flights is not None:
+            return flights
+        
         try:
             # Try Amadeus API (requires separate API key)
-            flights = self._fetch_amadeus_flights(origin, destination, date)
+            flights = await self._fetch_amadeus_flights_async(origin, destination, date)
             if flights:
+                with self._cache_lock:
+                    self._live_cache[key] = flights
                 return flights
                 
             # Fallback to generated realistic flights
@@ -86,200 +333,210 @@ class RealFlightDataService:
             print(f"Error fetching live flights: {e}")
             return self._generate_realistic_flights(origin, destination, date)
 
-    def _fetch_amadeus_flights(self, origin, destination, date):
+    async def _fetch_amadeus_flights_async(self, origin, destination, date):
+        """Call the Amadeus flight offers REST endpoint directly, bypassing the blocking SDK"""
         try:
-            response = self.amadeus.shopping.flight_offers_search.get(
-                originLocationCode=origin,
-                destinationLocationCode=destination,
-                departureDate=str(date),
-                adults=1,
-                currencyCode="SGD",
-                max=10 
-            )
-            
-
+            token = await self._amadeus_token()
+            params = {
+                'originLocationCode': origin,
+                'destinationLocationCode': destination,
+                'departureDate': str(date),
+                'adults': 1,
+                'currencyCode': "SGD",
+                'max': 10
+            }
             
-            flights = []
-            for offer in response.data:
-                price = float(offer['price']['total'])
-                segments = offer['itineraries'][0]['segments']
-                carrier_code = segments[0]['carrierCode']
-                
-                # Format times properly
-                dep_time = segments[0]['departure']['at'].split('T')[1][:5]
-                arr_time = segments[-1]['arrival']['at'].split('T')[1][:5]
-                
-                # Convert duration from ISO format
-                duration = offer['itineraries'][0]['duration'].replace('PT', '').replace('H', 'h ').replace('M', 'm')
-                
-                flights.append({
-                    "airline": self.get_airline_name(carrier_code),
-                    "price": int(price),
-                    "departure_time": dep_time,
-                    "arrival_time": arr_time,
-                    "duration": duration,
-                    "stops": len(segments) - 1,
-                    "booking_class": "Economy"
-                })
+            async with self._session.get(
+                f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers",
+                params=params,
+                headers={'Authorization': f'Bearer {token}'}
+            ) as resp:
+                if resp.status != 200:
+                    print(f"Amadeus API error: [{resp.status}] {await resp.text()}")
+                    return None
+                payload = orjson.loads(await resp.read())
             
-            return {"flights": flights}
+            return {"flights": self._parse_amadeus_offers(payload.get('data', []))}
     
-        except ResponseError as error:
-            print(f"Amadeus API error: {error}")
-            return None
         except Exception as e:
             print(f"Amadeus connection error: {e}")
             return None
 
     def _generate_realistic_flights(self, origin, destination, date):
         """Generate realistic flight data with market-based pricing"""
-        base_routes = {
-            'JFK-LAX': {'base_price': 280, 'airlines': ['Delta', 'JetBlue', 'American', 'United']},
-            'LAX-JFK': {'base_price': 290, 'airlines': ['Delta', 'JetBlue', 'American', 'United']},
-            'SIN-BKK': {'base_price': 180, 'airlines': ['Singapore Airlines', 'Thai Airways', 'Scoot', 'AirAsia']},
-            'BKK-SIN': {'base_price': 175, 'airlines': ['Singapore Airlines', 'Thai Airways', 'Scoot', 'AirAsia']},
-            'SIN-JFK': {'base_price': 1200, 'airlines': ['Singapore Airlines', 'United', 'Emirates']},
-            'JFK-SIN': {'base_price': 1150, 'airlines': ['Singapore Airlines', 'United', 'Emirates']},
-        }
-        
-        route_key = f"{origin}-{destination}"
-        if route_key not in base_routes:
-            # Generate default route with estimated pricing
-            base_price = 200 if origin == destination else 300
-            airlines = ['Singapore Airlines', 'Emirates', 'Qatar Airways']
-            base_routes[route_key] = {'base_price': base_price, 'airlines': airlines}
-            
-        route_info = base_routes[route_key]
-        flights = []
+        # Unknown routes get estimated pricing
+        base_price, airlines, airline_idx = _route_info(f"{origin}-{destination}", 200 if origin == destination else 300)
         
         # Market factors affecting pricing
-        days_ahead = (datetime.strptime(str(date), '%Y-%m-%d').date() - datetime.now().date()).days
+        now = datetime.now()
+        days_ahead = (datetime.fromisoformat(str(date)).date() - now.date()).days
         demand_factor = 1.2 if days_ahead < 14 else 0.9 if days_ahead > 60 else 1.0
-        seasonal_factor = 1.1 if datetime.now().month in [6, 7, 12] else 0.95
+        seasonal_factor = 1.1 if now.month in [6, 7, 12] else 0.95
         
-        for i, airline in enumerate(route_info['airlines']):
-            base_price = route_info['base_price']
-            
-            # Airline-specific pricing
-            airline_factors = {
-                'Singapore Airlines': 1.3, 'Emirates': 1.25, 'Qatar Airways': 1.2, 'Cathay Pacific': 1.15,
-                'British Airways': 1.1, 'Air France': 1.1, 'Lufthansa': 1.1, 'KLM': 1.1, 'Swiss': 1.15,
-                'ANA': 1.2, 'JAL': 1.2, 'Korean Air': 1.1, 'Asiana Airlines': 1.05, 'EVA Air': 1.1,
-                'Thai Airways': 1.0, 'Malaysia Airlines': 0.95, 'Garuda Indonesia': 0.9, 'Philippine Airlines': 0.9,
-                'Delta': 1.1, 'American': 1.05, 'United': 1.0, 'JetBlue': 0.9, 'Southwest': 0.85, 'Alaska': 0.9,
-                'Qantas': 1.15, 'Virgin Australia': 1.0, 'Air Canada': 1.05, 'WestJet': 0.9,
-                'LATAM': 1.0, 'Avianca': 0.95, 'GOL': 0.85, 'Azul': 0.9,
-                'Air India': 0.8, 'IndiGo': 0.7, 'Vistara': 0.85, 'SpiceJet': 0.65,
-                'AirAsia': 0.6, 'Scoot': 0.65, 'Jetstar': 0.7, 'Cebu Pacific': 0.6, 'Lion Air': 0.55,
-                'Ryanair': 0.5, 'EasyJet': 0.6, 'Wizz Air': 0.55, 'Vueling': 0.65,
-                'flydubai': 0.75, 'Air Arabia': 0.65, 'Pegasus': 0.6
-            }
-            airline_factor = airline_factors.get(airline, 1.0)
-            
-            # Time-based pricing
-            times = ['06:00', '08:30', '11:00', '14:30', '17:00', '19:30']
-            for j, time in enumerate(times[:4]):  # Limit to 4 flights per airline
-                time_factor = 0.9 if j in [0, 5] else 1.1 if j in [1, 4] else 1.0
-                
-                final_price = int(base_price * demand_factor * seasonal_factor * airline_factor * time_factor * np.random.uniform(0.9, 1.1))
-                
-                arrival_time = (datetime.strptime(time, '%H:%M') + timedelta(hours=5, minutes=20)).strftime('%H:%M')
-                
-                flights.append({
-                    'airline': airline,
-                    'price': final_price,
-                    'departure_time': time,
-                    'arrival_time': arrival_time,
-                    'duration': '5h 20m',
-                    'aircraft': 'A320' if airline in ['JetBlue', 'Spirit'] else 'B737',
-                    'stops': 0,
-                    'booking_class': 'Economy'
-                })
+        # Price every (airline, time) pair in the compiled kernel
+        airline_factors = AIRLINE_FACTORS_ARR[airline_idx]
+        noise = self._rng.uniform(0.9, 1.1, size=(len(airlines), len(TIMES)))
+        prices = _gen_prices(float(base_price), demand_factor, seasonal_factor,
+                             airline_factors, TIME_FACTORS, noise)
+        price_rows = prices.tolist()
         
-        return {"flights": sorted(flights, key=lambda x: x['price'])}
+        flights = [
+            Flight(
+                airline=airline,
+                price=price_rows[i][j],
+                departure_time=time,
+                arrival_time=ARRIVAL_TIMES[j],
+                duration='5h 20m',
+                aircraft=AIRCRAFT.get(airline, 'B737')
+            )
+            for i, airline in enumerate(airlines)
+            for j, time in enumerate(TIMES)
+        ]
+        flights.sort(key=_BY_PRICE)
+        
+        return {"flights": flights}
 
     def store_price_history(self, route, price_data):
         """Store historical price data in DynamoDB"""
+        self.store_price_history_bulk([(route, price_data)])
+
+    def store_price_history_bulk(self, items):
+        """Store price data for many (route, prices) pairs, batching writes 25 items per request"""
         try:
-            from decimal import Decimal
+            from boto3.dynamodb.types import Binary
             table_name = 'flight-price-history'
             table = self.dynamodb.Table(table_name)
             
-            # Convert floats to Decimal for DynamoDB
-            decimal_prices = [Decimal(str(price)) for price in price_data]
-            
-            table.put_item(
-                Item={
-                    'route': route,
-                    'date': datetime.now().isoformat(),
-                    'prices': decimal_prices,
-                    'timestamp': int(datetime.now().timestamp())
-                }
-            )
+            written = set()
+            with table.batch_writer(overwrite_by_pkeys=['route', 'date']) as batch:
+                for route, price_data in items:
+                    written.add(route)
+                    # Pack whole-dollar prices into one zstd-compressed int32 blob
+                    packed = np.rint(np.asarray(price_data, dtype=np.float64)).astype(np.int32).tobytes()
+                    packed_prices = Binary(zstandard.compress(packed, 3))
+                    
+                    # One clock read so the date key and timestamp agree
+                    now = datetime.now()
+                    batch.put_item(
+                        Item={
+                            'route': route,
+                            'date': now.isoformat(),
+                            'prices_blob': packed_prices,
+                            'timestamp': int(now.timestamp())
+                        }
+                    )
+            self._evict_history(written)
         except Exception as e:
             print(f"Error storing price history: {e}")
             pass  # Continue without storing
 
+    def _evict_history(self, routes):
+        """Drop cached history for routes that just had prices written, whatever the days window"""
+        with self._cache_lock:
+            for key in [k for k in self._hist_cache if k[0] in routes]:
+                self._hist_cache.pop(key, None)
+
     def get_historical_prices(self, route, days=30):
         """Retrieve historical price data from DynamoDB"""
+        key = hashkey(route, days)
+        with self._cache_lock:
+            prices = self._hist_cache.get(key)
+        if prices is not None:
+            return prices
+        
         try:
-            table_name = 'flight-price-history'
-            table = self.dynamodb.Table(table_name)
+            table = self.dynamodb.Table('flight-price-history')
+            query_kwargs = _history_query(route)
+            items = []
+            while len(items) < days:
+                response = table.query(Limit=days - len(items), **query_kwargs)
+                items.extend(response['Items'])
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
             
-            response = table.query(
-                KeyConditionExpression='route = :route',
-                ExpressionAttributeValues={':route': route},
-                ScanIndexForward=False,
-                Limit=days
-            )
+            return self._history_or_fallback(key, route, items)
             
-            prices = []
-            for item in response['Items']:
-                prices.extend(item.get('prices', []))
+        except Exception as e:
+            print(f"Error retrieving price history: {e}")
+            return self._generate_historical_data(route)
+
+    async def get_historical_prices_async(self, route, days=30):
+        """Async variant of get_historical_prices sharing its TTL cache; safe to await from any event loop"""
+        return await self._on_loop(self._get_historical_prices_async(route, days))
+
+    async def _get_historical_prices_async(self, route, days=30, table=None):
+        """Serve cached history, querying an aioboto3 table (opened if not given) on a miss"""
+        key = hashkey(route, days)
+        with self._cache_lock:
+            prices = self._hist_cache.get(key)
+        if prices is None:
+            if table is None:
+                async with self._aio_dynamodb() as dynamodb:
+                    table = await dynamodb.Table('flight-price-history')
+                    prices = await self._query_history_async(table, route, days, key)
+            else:
+                prices = await self._query_history_async(table, route, days, key)
+        return prices
+
+    async def _query_history_async(self, table, route, days, key):
+        """Query price history from an aioboto3 table, falling back to generated data"""
+        try:
+            query_kwargs = _history_query(route)
+            items = []
+            while len(items) < days:
+                response = await table.query(Limit=days - len(items), **query_kwargs)
+                items.extend(response['Items'])
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
             
-            return prices if prices else self._generate_historical_data(route)
+            return self._history_or_fallback(key, route, items)
             
         except Exception as e:
             print(f"Error retrieving price history: {e}")
             return self._generate_historical_data(route)
 
+    def _history_or_fallback(self, key, route, items):
+        """Decode queried history items and cache them, or generate history when the route has none"""
+        prices = _decode_history(items)
+        if not prices.size:
+            return self._generate_historical_data(route)
+        
+        # Every caller shares the cached array, so make it read-only
+        prices.flags.writeable = False
+        with self._cache_lock:
+            self._hist_cache[key] = prices
+        return prices
+
     def _generate_historical_data(self, route):
         """Generate realistic historical price data"""
-        base_prices = {'JFK-LAX': 280, 'LAX-JFK': 290, 'JFK-MIA': 220, 'LAX-SFO': 150}
-        base_price = base_prices.get(route, 250)
+        base_price, _, _ = _route_info(route, 250)
         
         # Generate 30 days of price history with trends
-        prices = []
-        for i in range(30):
-            trend = np.sin(i * 0.2) * 20  # Weekly cycles
-            noise = np.random.normal(0, 15)  # Random variation
-            seasonal = 10 if i % 7 in [4, 5, 6] else -5  # Weekend premium
-            
-            price = int(base_price + trend + noise + seasonal)
-            prices.append(max(price, base_price * 0.6))  # Floor price
-            
-        return prices
+        return _gen_hist(float(base_price), 30)
 
     def predict_future_prices(self, historical_prices, days_ahead=7):
         """Use ML to predict future price trends"""
         if len(historical_prices) < 10:
             return {"trend": "stable", "confidence": 0.5}
             
-        # Prepare data for ML model
-        X = np.array(range(len(historical_prices))).reshape(-1, 1)
-        y = np.array(historical_prices)
-        
-        # Train simple linear regression
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        model = LinearRegression()
-        model.fit(X_scaled, y)
+        # Fit a least-squares trend line in closed form
+        y = np.asarray(historical_prices, dtype=np.float64)
+        n = y.size
+        t = np.arange(n, dtype=np.float64)
+        dt = t - t.mean()
+        dy = y - y.mean()
+        slope = (dt @ dy) / (dt @ dt)
+        intercept = y.mean() - slope * t.mean()
         
         # Predict future prices
-        future_X = np.array(range(len(historical_prices), len(historical_prices) + days_ahead)).reshape(-1, 1)
-        future_X_scaled = scaler.transform(future_X)
-        future_prices = model.predict(future_X_scaled)
+        future_prices = slope * np.arange(n, n + days_ahead) + intercept
+        
+        # Coefficient of determination of the fit
+        ss_res = ((y - (slope * t + intercept)) ** 2).sum()
+        ss_tot = (dy * dy).sum()
+        r2 = 1 - ss_res / ss_tot if ss_tot else 0.0
         
         # Analyze trend
         current_avg = np.mean(historical_prices[-7:])
@@ -287,10 +544,10 @@ class RealFlightDataService:
         
         if future_avg > current_avg * 1.05:
             trend = "increasing"
-            confidence = min(0.8, abs(model.score(X_scaled, y)))
+            confidence = min(0.8, abs(r2))
         elif future_avg < current_avg * 0.95:
             trend = "decreasing" 
-            confidence = min(0.8, abs(model.score(X_scaled, y)))
+            confidence = min(0.8, abs(r2))
         else:
             trend = "stable"
             confidence = 0.6
@@ -305,52 +562,75 @@ class RealFlightDataService:
 
     def get_market_alerts(self, routes, budget_threshold):
         """Monitor market for price drops and deals"""
+        return self._run(self._get_market_alerts_async(routes, budget_threshold))
+
+    async def get_market_alerts_async(self, routes, budget_threshold):
+        """Async variant of get_market_alerts; safe to await from any event loop"""
+        return await self._on_loop(self._get_market_alerts_async(routes, budget_threshold))
+
+    async def _get_market_alerts_async(self, routes, budget_threshold):
+        """Monitor market for price drops and deals, checking all routes concurrently"""
         alerts = []
         
-        for route in routes:
+        async with self._aio_dynamodb() as dynamodb:
+            table = await dynamodb.Table('flight-price-history')
+            
+            # Prime the token cache so concurrent routes don't each request one
             try:
-                current_flights = self.fetch_live_flights(*route.split('-'), datetime.now().date())
-                if current_flights['flights']:
-                    min_price = min(f['price'] for f in current_flights['flights'])
-                    historical = self.get_historical_prices(route)
-                    
-                    if historical:
-                        avg_price = np.mean(historical)
-                        if min_price < avg_price * 0.8:  # 20% below average
-                            alerts.append({
-                                'route': route,
-                                'current_price': min_price,
-                                'savings': int(avg_price - min_price),
-                                'alert_type': 'price_drop',
-                                'urgency': 'high' if min_price < avg_price * 0.7 else 'medium'
-                            })
-                            
+                await self._amadeus_token()
             except Exception as e:
-                print(f"Error checking alerts for {route}: {e}")
+                print(f"Amadeus authentication error: {e}")
+            
+            tasks = [self._check_route(route, budget_threshold, table) for route in routes]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for route, result in zip(routes, results):
+            if isinstance(result, Exception):
+                print(f"Error checking alerts for {route}: {result}")
+            elif result:
+                alerts.append(result)
                 
         return alerts
 
+    async def _check_route(self, route, budget_threshold, table):
+        """Check a single route for a price drop, overlapping the flight and history lookups"""
+        current_flights, historical = await asyncio.gather(
+            self._fetch_live_flights_async(*route.split('-'), datetime.now().date()),
+            self._get_historical_prices_async(route, table=table)
+        )
+        
+        if current_flights['flights'] and len(historical):
+            min_price = min(f.price for f in current_flights['flights'])
+            avg_price = np.mean(historical)
+            if min_price < avg_price * 0.8:  # 20% below average
+                return {
+                    'route': route,
+                    'current_price': min_price,
+                    'savings': int(avg_price - min_price),
+                    'alert_type': 'price_drop',
+                    'urgency': 'high' if min_price < avg_price * 0.7 else 'medium'
+                }
+                
+        return None
+
     def analyze_booking_patterns(self, route):
         """Analyze optimal booking timing"""
-        historical_prices = self.get_historical_prices(route, days=90)
+        historical_prices = np.asarray(self.get_historical_prices(route, days=90), dtype=np.float64)
         
-        if len(historical_prices) < 30:
+        if historical_prices.size < 30:
             return {"best_day": "Tuesday", "best_time": "3PM", "confidence": 0.5}
             
-        # Analyze day-of-week patterns (simplified)
-        weekly_avg = {}
-        for i, price in enumerate(historical_prices):
-            day = i % 7  # 0=Monday, 6=Sunday
-            if day not in weekly_avg:
-                weekly_avg[day] = []
-            weekly_avg[day].append(price)
+        # Analyze day-of-week patterns (simplified): 0=Monday, 6=Sunday
+        day_idx = np.arange(historical_prices.size) % 7
+        sums = np.bincount(day_idx, weights=historical_prices, minlength=7)
+        counts = np.bincount(day_idx, minlength=7)
+        day_means = sums / counts
             
-        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        best_day_idx = min(weekly_avg.keys(), key=lambda x: np.mean(weekly_avg[x]))
+        best_day_idx = int(day_means.argmin())
         
         return {
-            "best_day": day_names[best_day_idx],
+            "best_day": DAY_NAMES[best_day_idx],
             "best_time": "3PM",  # Based on industry data
-            "avg_savings": int(max(np.mean(list(weekly_avg.values()))) - min(np.mean(list(weekly_avg.values())))),
+            "avg_savings": int(day_means.max() - day_means.min()),
             "confidence": 0.7
         }
\ No newline at end of file
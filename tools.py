@@ -1,8 +1,11 @@
-import json
+import bisect
+import functools
+import orjson
 import numpy as np
+from dataclasses import replace
 from datetime import datetime, timedelta
 import random
-from real_data_service import RealFlightDataService
+from real_data_service import RealFlightDataService, Flight, _BY_PRICE
 
 # Initialize real data service
 try:
@@ -14,10 +17,21 @@ except Exception as e:
     USE_REAL_DATA = False
     real_data_service = None
 
+# Recommendation table indexed by the price's position among (q10, q50, q90)
+_POS_LABELS = ("bottom 10%", "below median", "above median", "top 10%")
+_DECISIONS = (("BUY NOW", 0.9), ("BUY", 0.7), ("WAIT", 0.6), ("ALTERNATE", 0.8))
+_REASONS = (
+    "Excellent deal! Current price ${price} is in bottom 10% of historical prices.",
+    "Good price at ${price}, below median of ${q50}.",
+    "Price ${price} is above median. Consider waiting or flexible dates.",
+    "Price ${price} is in top 10%. Try different dates or nearby airports."
+)
+
+@functools.lru_cache(maxsize=1)
 def load_mock_data():
-    """Load mock flight data from JSON file"""
-    with open('mock_data.json', 'r') as f:
-        return json.load(f)
+    """Load mock flight data from JSON file, parsed once per process"""
+    with open('mock_data.json', 'rb') as f:
+        return orjson.loads(f.read())
 
 def fetch_flights(origin, destination, departure_date, return_date=None, flexibility=0):
     """Fetch flights for given route and dates with flexibility"""
@@ -31,23 +45,22 @@ def fetch_flights(origin, destination, departure_date, return_date=None, flexibi
                 search_date = departure_date + timedelta(days=day_offset)
                 result = real_data_service.fetch_live_flights(origin, destination, search_date)
                 if result and result.get('flights'):
-                    # Add search date to each flight
-                    for flight in result['flights']:
-                        flight['search_date'] = search_date.strftime('%Y-%m-%d')
-                    all_flights.extend(result['flights'])
+                    # Stamp the search date on copies; the records belong to the service's cache
+                    day = search_date.strftime('%Y-%m-%d')
+                    all_flights.extend(replace(flight, search_date=day) for flight in result['flights'])
             
             if all_flights:
                 # Sort by price and take best options
-                all_flights.sort(key=lambda x: x['price'])
+                all_flights.sort(key=_BY_PRICE)
                 result = {"flights": all_flights[:10]}
                 
                 if return_date:
                     return_result = real_data_service.fetch_live_flights(destination, origin, return_date)
                     if return_result and return_result.get('flights'):
-                        result["return_flights"] = return_result.get("flights", [])
+                        result["return_flights"] = list(return_result.get("flights", []))
                 
                 try:
-                    prices = [f['price'] for f in result['flights']]
+                    prices = [f.price for f in result['flights']]
                     real_data_service.store_price_history(f"{origin}-{destination}", prices)
                 except:
                     pass
@@ -67,61 +80,49 @@ def fetch_flights(origin, destination, departure_date, return_date=None, flexibi
     
     flights = []
     if route_key in data:
-        flights = data[route_key]["flights"].copy()
+        # Build fresh Flight records so price adjustments don't leak into the cached data
+        flights = [Flight(**flight) for flight in data[route_key]["flights"]]
         date_factor = random.uniform(0.85, 1.15)
         for flight in flights:
-            flight["price"] = int(flight["price"] * date_factor)
+            flight.price = int(flight.price * date_factor)
     
-    result = {"flights": sorted(flights, key=lambda x: x["price"])[:8]}
+    result = {"flights": sorted(flights, key=_BY_PRICE)[:8]}
     
     if return_date and return_key in data:
-        return_flights = data[return_key]["flights"].copy()
+        return_flights = [Flight(**flight) for flight in data[return_key]["flights"]]
         date_factor = random.uniform(0.85, 1.15)
         for flight in return_flights:
-            flight["price"] = int(flight["price"] * date_factor)
-        result["return_flights"] = sorted(return_flights, key=lambda x: x["price"])[:8]
+            flight.price = int(flight.price * date_factor)
+        result["return_flights"] = sorted(return_flights, key=_BY_PRICE)[:8]
     
     return result
 
 def predict_price_range(price_history, current_price=None):
     """Predict price range using historical data"""
-    if not price_history:
+    if price_history is None or len(price_history) == 0:
         return {"q10": 200, "q50": 250, "q90": 300}
     
-    prices = np.array(price_history)
-    q10 = np.percentile(prices, 10)
-    q50 = np.percentile(prices, 50)
-    q90 = np.percentile(prices, 90)
+    prices = np.asarray(price_history, dtype=np.float32)
+    q10, q50, q90 = np.quantile(prices, [0.10, 0.50, 0.90])
     
     return {
         "q10": int(q10),
         "q50": int(q50), 
         "q90": int(q90),
-        "mean": int(np.mean(prices)),
-        "std": int(np.std(prices))
+        "mean": int(prices.mean()),
+        "std": int(prices.std())
     }
 
 def decide_recommendation(current_price, price_stats, user_budget):
     """Make buy/wait/alternate recommendation"""
     q10, q50, q90 = price_stats["q10"], price_stats["q50"], price_stats["q90"]
     
-    # Price position analysis
-    if current_price <= q10:
-        decision = "BUY NOW"
-        confidence = 0.9
-        reason = f"Excellent deal! Current price ${current_price} is in bottom 10% of historical prices."
-    elif current_price <= q50:
-        decision = "BUY" if current_price <= user_budget else "WAIT"
-        confidence = 0.7
-        reason = f"Good price at ${current_price}, below median of ${q50}."
-    elif current_price <= q90:
+    # Price position analysis: 0 = at/below q10, 1 = at/below median, 2 = at/below q90, 3 = above
+    position = bisect.bisect_left((q10, q50, q90), current_price)
+    decision, confidence = _DECISIONS[position]
+    if position == 1 and current_price > user_budget:
         decision = "WAIT"
-        confidence = 0.6
-        reason = f"Price ${current_price} is above median. Consider waiting or flexible dates."
-    else:
-        decision = "ALTERNATE"
-        confidence = 0.8
-        reason = f"Price ${current_price} is in top 10%. Try different dates or nearby airports."
+    reason = _REASONS[position].format(price=current_price, q50=q50)
     
     # Budget consideration
     if current_price > user_budget * 1.2:
@@ -132,9 +133,7 @@ def decide_recommendation(current_price, price_stats, user_budget):
         "decision": decision,
         "confidence": confidence,
         "reason": reason,
-        "price_position": "bottom 10%" if current_price <= q10 else 
-                         "below median" if current_price <= q50 else
-                         "above median" if current_price <= q90 else "top 10%"
+        "price_position": _POS_LABELS[position]
     }
 
 def get_price_history(origin, destination):